@@ -0,0 +1,243 @@
+# scripts/scenario_simulation.py
+#
+# What-if simulacija popustov nad obstoječo DuckDB bazo (brez ponovnega zagona
+# mysql_to_duckdb.py). Skripta:
+#  1) Iz pogleda `fact_with_dim` enkrat pred-agregira mere po segmentih
+#     (kategorija × starostna_skupina × drzava, ločeno po popust_uporabljen).
+#  2) Zgradi tabelo scenarijev: vsak scenarij izbere segment X (NULL = vse
+#     vrednosti dimenzije) in delež obiskov brez popusta, ki jih "prestavimo"
+#     na popust.
+#  3) Vse scenarije oceni v ENI DuckDB poizvedbi (JOIN segmentov s tabelo
+#     scenarijev + GROUP BY scenarij) in vrne tabelo, rangirano po spremembi
+#     prihodka (prihodek, KPI 1, KPI 2, strošek popustov). Prva vrstica je
+#     izhodišče (pokritost 0 = trenutno stanje), s katerim se scenariji primerjajo.
+#  4) Izmeri prepustnost (scenarijev na sekundo).
+#
+# Model: prestavljeni obiski segmenta se obnašajo kot obiski z uporabljenim
+# popustom v istem segmentu (stopnja konverzije, prihodek, povprecno_na_transakcijo
+# in znesek popusta na transakcijo). Če segment nima transakcij s popustom, se
+# uporabijo globalne stopnje za popust_uporabljen = 'Yes'.
+#
+# skupni_prihodek obravnavamo kot NETO prihodek (znesek, ki ga je kupec plačal,
+# popust je že odštet). Zato sta `revenue` in `delta_revenue` že neto in
+# scenarije rangiramo po `delta_revenue`; `discount_cost` (vsota znesekPopusta)
+# je le informativen stolpec in se od prihodka NE odšteva še enkrat.
+#
+# KPI 1 in KPI 2 sta definirana enako kot v mysql_to_duckdb.py:
+#   KPI 1 = AVG(povprecno_na_transakcijo)
+#   KPI 2 = 100 * COUNT(*) / SUM(obiski_na_uporabnika)
+# pri pokritosti 0 se torej ujemata z vrednostma, ki ju izpiše mysql_to_duckdb.py.
+#
+import os
+import time
+import itertools
+import duckdb
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DUCKDB_PATH  = os.path.join(PROJECT_ROOT, "duckdb_database", "dwpikp.duckdb")
+
+# Deleži obiskov brez popusta, ki jih v scenariju prestavimo na popust
+COVERAGE_LEVELS = [0.1, 0.25, 0.5, 0.75, 1.0]
+BENCHMARK_RUNS  = 20
+TOP_N           = 20
+
+
+# -----------------------------------------------------------------------------
+# 1) PRED-AGREGACIJA MER PO SEGMENTIH
+# -----------------------------------------------------------------------------
+SEGMENT_MEASURES_SQL = """
+WITH base AS (
+  SELECT
+    kategorija,
+    starostna_skupina,
+    drzava,
+    COUNT(*) FILTER (WHERE popust_uporabljen =  'Yes')                          AS tx_yes,
+    COUNT(*) FILTER (WHERE popust_uporabljen <> 'Yes' OR popust_uporabljen IS NULL) AS tx_no,
+    COALESCE(SUM(obiski_na_uporabnika) FILTER (WHERE popust_uporabljen = 'Yes'), 0)  AS visits_yes,
+    COALESCE(SUM(obiski_na_uporabnika) FILTER (WHERE popust_uporabljen <> 'Yes' OR popust_uporabljen IS NULL), 0) AS visits_no,
+    COALESCE(SUM(skupni_prihodek) FILTER (WHERE popust_uporabljen = 'Yes'), 0)       AS rev_yes,
+    COALESCE(SUM(skupni_prihodek) FILTER (WHERE popust_uporabljen <> 'Yes' OR popust_uporabljen IS NULL), 0) AS rev_no,
+    COALESCE(SUM(znesek_popusta) FILTER (WHERE popust_uporabljen = 'Yes'), 0)        AS disc_yes,
+    COALESCE(SUM(povprecno_na_transakcijo) FILTER (WHERE popust_uporabljen = 'Yes'), 0) AS apt_sum_yes,
+    COALESCE(SUM(povprecno_na_transakcijo) FILTER (WHERE popust_uporabljen <> 'Yes' OR popust_uporabljen IS NULL), 0) AS apt_sum_no,
+    COUNT(povprecno_na_transakcijo) FILTER (WHERE popust_uporabljen = 'Yes')             AS apt_cnt_yes,
+    COUNT(povprecno_na_transakcijo) FILTER (WHERE popust_uporabljen <> 'Yes' OR popust_uporabljen IS NULL) AS apt_cnt_no
+  FROM fact_with_dim
+  GROUP BY kategorija, starostna_skupina, drzava
+),
+global_yes AS (
+  SELECT
+    1.0 * SUM(tx_yes) / NULLIF(SUM(visits_yes), 0) AS conv_yes,
+    1.0 * SUM(rev_yes) / NULLIF(SUM(tx_yes), 0)     AS spend_yes,
+    1.0 * SUM(disc_yes) / NULLIF(SUM(tx_yes), 0)     AS disc_per_tx_yes,
+    1.0 * SUM(apt_sum_yes) / NULLIF(SUM(apt_cnt_yes), 0) AS apt_yes
+  FROM base
+)
+SELECT
+  b.kategorija,
+  b.starostna_skupina,
+  b.drzava,
+  b.tx_yes + b.tx_no                                                    AS tx,
+  b.visits_yes + b.visits_no                                            AS visits,
+  b.rev_yes + b.rev_no                                                  AS revenue,
+  b.disc_yes                                                            AS discount_cost,
+  b.tx_no,
+  b.visits_no,
+  b.rev_no,
+  b.apt_sum_yes + b.apt_sum_no                                          AS apt_sum,
+  b.apt_cnt_yes + b.apt_cnt_no                                          AS apt_cnt,
+  b.apt_sum_no,
+  b.apt_cnt_no,
+  COALESCE(1.0 * b.tx_yes   / NULLIF(b.visits_yes, 0), g.conv_yes, 0)        AS conv_yes,
+  COALESCE(1.0 * b.rev_yes  / NULLIF(b.tx_yes, 0),     g.spend_yes, 0)       AS spend_yes,
+  COALESCE(1.0 * b.disc_yes / NULLIF(b.tx_yes, 0),     g.disc_per_tx_yes, 0) AS disc_per_tx_yes,
+  COALESCE(1.0 * b.apt_sum_yes / NULLIF(b.apt_cnt_yes, 0), g.apt_yes, 0)   AS apt_yes
+FROM base b
+CROSS JOIN global_yes g;
+"""
+
+
+def build_segment_measures(con):
+    """
+    Enkrat pred-agregira `fact_with_dim` in rezultat registrira kot
+    `segment_measures` (baza ostane odprta samo za branje). Vrne DataFrame.
+    """
+    measures = con.execute(SEGMENT_MEASURES_SQL).df()
+    con.register("segment_measures", measures)
+    return measures
+
+
+# -----------------------------------------------------------------------------
+# 2) TABELA SCENARIJEV
+# -----------------------------------------------------------------------------
+def build_scenarios(measures, coverage_levels=COVERAGE_LEVELS):
+    """
+    Vrne DataFrame scenarijev: vse kombinacije vrednosti kategorija,
+    starostna_skupina in drzava (None = vse) × deleži pokritosti. Scenarij 0
+    je izhodišče (pokritost 0 = trenutno stanje).
+    """
+    def levels(column):
+        return [None] + sorted(measures[column].dropna().unique().tolist())
+
+    rows = [(None, None, None, 0.0)]
+    rows += itertools.product(
+        levels("kategorija"),
+        levels("starostna_skupina"),
+        levels("drzava"),
+        coverage_levels,
+    )
+    scenarios = pd.DataFrame(
+        rows, columns=["kategorija", "starostna_skupina", "drzava", "coverage"]
+    )
+    scenarios.insert(0, "scenario_id", range(len(scenarios)))
+    return scenarios
+
+
+# -----------------------------------------------------------------------------
+# 3) VREDNOTENJE VSEH SCENARIJEV V ENI POIZVEDBI
+# -----------------------------------------------------------------------------
+EVALUATE_SQL = """
+WITH totals AS (
+  SELECT
+    SUM(tx)            AS tx,
+    SUM(visits)        AS visits,
+    SUM(revenue)       AS revenue,
+    SUM(discount_cost) AS discount_cost,
+    SUM(apt_sum)       AS apt_sum,
+    SUM(apt_cnt)       AS apt_cnt
+  FROM segment_measures
+),
+deltas AS (
+  SELECT
+    s.scenario_id,
+    COALESCE(SUM(s.coverage * (m.visits_no * m.conv_yes - m.tx_no)), 0)                   AS delta_tx,
+    COALESCE(SUM(s.coverage * (m.visits_no * m.conv_yes * m.spend_yes - m.rev_no)), 0)    AS delta_revenue,
+    COALESCE(SUM(s.coverage * m.visits_no * m.conv_yes * m.disc_per_tx_yes), 0)           AS delta_discount_cost,
+    COALESCE(SUM(s.coverage * (m.visits_no * m.conv_yes * m.apt_yes - m.apt_sum_no)), 0)  AS delta_apt_sum,
+    COALESCE(SUM(s.coverage * (m.visits_no * m.conv_yes - m.apt_cnt_no)), 0)              AS delta_apt_cnt
+  FROM scenarios s
+  LEFT JOIN segment_measures m
+    ON  (s.kategorija        IS NULL OR m.kategorija        = s.kategorija)
+    AND (s.starostna_skupina IS NULL OR m.starostna_skupina = s.starostna_skupina)
+    AND (s.drzava            IS NULL OR m.drzava            = s.drzava)
+  GROUP BY s.scenario_id
+)
+SELECT
+  s.scenario_id,
+  COALESCE(s.kategorija,        '(vse)')                          AS kategorija,
+  COALESCE(s.starostna_skupina, '(vse)')                          AS starostna_skupina,
+  COALESCE(s.drzava,            '(vse)')                          AS drzava,
+  s.coverage,
+  t.revenue + d.delta_revenue                                     AS revenue,
+  d.delta_revenue,
+  1.0 * (t.apt_sum + d.delta_apt_sum) / NULLIF(t.apt_cnt + d.delta_apt_cnt, 0) AS kpi1_avg_spend,
+  1.0 * (t.apt_sum + d.delta_apt_sum) / NULLIF(t.apt_cnt + d.delta_apt_cnt, 0)
+    - 1.0 * t.apt_sum / NULLIF(t.apt_cnt, 0)                      AS delta_kpi1,
+  100.0 * (t.tx + d.delta_tx) / NULLIF(t.visits, 0)               AS kpi2_conversion_rate_percent,
+  100.0 * d.delta_tx / NULLIF(t.visits, 0)                        AS delta_kpi2_pp,
+  t.discount_cost + d.delta_discount_cost                         AS discount_cost,
+  RANK() OVER (ORDER BY d.delta_revenue DESC)                     AS rang
+FROM scenarios s
+JOIN deltas d ON d.scenario_id = s.scenario_id
+CROSS JOIN totals t
+ORDER BY s.coverage = 0 DESC, rang, s.scenario_id;
+"""
+
+
+def evaluate_scenarios(con, scenarios):
+    """
+    Oceni vse scenarije v eni poizvedbi in vrne tabelo, rangirano po
+    spremembi (neto) prihodka. Prva vrstica je izhodišče (pokritost 0).
+    """
+    con.register("scenarios", scenarios)
+    try:
+        return con.execute(EVALUATE_SQL).df()
+    finally:
+        con.unregister("scenarios")
+
+
+# -----------------------------------------------------------------------------
+# 4) MERJENJE PREPUSTNOSTI
+# -----------------------------------------------------------------------------
+def benchmark(con, scenarios, runs=BENCHMARK_RUNS):
+    """
+    Večkrat oceni celoten paket scenarijev in vrne najboljši čas (s) ter
+    prepustnost v scenarijih na sekundo.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        evaluate_scenarios(con, scenarios)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return best, len(scenarios) / best
+
+
+def main():
+    print("▶ Opening DuckDB at:", DUCKDB_PATH)
+    con = duckdb.connect(database=DUCKDB_PATH, read_only=True)
+
+    start = time.perf_counter()
+    measures = build_segment_measures(con)
+    print(f"   → Pre-aggregated {len(measures)} segments in {time.perf_counter() - start:.3f} s")
+
+    scenarios = build_scenarios(measures)
+    print(f"   → Built {len(scenarios)} scenarios")
+
+    results = evaluate_scenarios(con, scenarios)
+    print(f"\n=== IZHODIŠČE + TOP {TOP_N} SCENARIJEV (po spremembi prihodka) ===")
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(results.head(TOP_N + 1))
+
+    best, throughput = benchmark(con, scenarios)
+    print(
+        f"\n▶ Benchmark: {len(scenarios)} scenarios in {best * 1000:.1f} ms "
+        f"(best of {BENCHMARK_RUNS}) → {throughput:,.0f} scenarios/s"
+    )
+
+    con.close()
+
+
+if __name__ == "__main__":
+    main()